@@ -6,10 +6,12 @@ Hold the hotkey to record, release to transcribe and copy to clipboard.
 
 import argparse
 import configparser
+import gc
+import math
+import queue
+import shutil
 import subprocess
-import tempfile
 import threading
-import selectors
 import signal
 import time
 import sys
@@ -17,8 +19,24 @@ import os
 from pathlib import Path
 
 import evdev
+import numpy as np
 from evdev import ecodes
 from faster_whisper import WhisperModel
+from faster_whisper.audio import pad_or_trim
+from faster_whisper.vad import get_speech_timestamps, get_vad_model
+from huggingface_hub.errors import LocalEntryNotFoundError
+
+try:
+    import sounddevice as sd
+except (ImportError, OSError):  # OSError: PortAudio library not found
+    sd = None
+
+try:
+    import gi
+    gi.require_version("Notify", "0.7")
+    from gi.repository import GLib, Notify
+except (ImportError, ValueError):  # ValueError: libnotify typelib not installed
+    Notify = None
 
 __version__ = "0.1.0"
 
@@ -40,30 +58,47 @@ SESSION_TYPE = detect_session_type()
 # Load configuration
 CONFIG_PATH = Path.home() / ".config" / "soupawhisper" / "config.ini"
 
+DEFAULT_MODEL = "distil-small.en"
+# Used instead of DEFAULT_MODEL when that isn't downloaded and can't be fetched (e.g. offline)
+FALLBACK_MODEL = "base.en"
+
 
 def load_config():
     config = configparser.ConfigParser()
 
-    # Defaults
-    defaults = {
-        "model": "base.en",
-        "device": "cpu",
-        "compute_type": "int8",
-        "key": "f12",
-        "auto_type": "true",
-        "notifications": "true",
-    }
-
-    if CONFIG_PATH.exists():
-        config.read(CONFIG_PATH)
-
+    # Defaults, overridden by whatever the config file sets
+    config.read_dict({
+        "whisper": {
+            "model": DEFAULT_MODEL,
+            "device": "cpu",
+            "compute_type": "auto",
+            "beam_size": "1",
+        },
+        "hotkey": {
+            "key": "f12",
+            "grab": "false",
+        },
+        "behavior": {
+            "auto_type": "true",
+            "paste_threshold": "50",
+            "paste_keys": "ctrl+shift+v",
+            "notifications": "true",
+        },
+    })
+    config.read(CONFIG_PATH)  # silently skipped if the file doesn't exist
+
+    whisper = config["whisper"]
+    hotkey = config["hotkey"]
+    behavior = config["behavior"]
     return {
-        "model": config.get("whisper", "model", fallback=defaults["model"]),
-        "device": config.get("whisper", "device", fallback=defaults["device"]),
-        "compute_type": config.get("whisper", "compute_type", fallback=defaults["compute_type"]),
-        "key": config.get("hotkey", "key", fallback=defaults["key"]),
-        "auto_type": config.getboolean("behavior", "auto_type", fallback=True),
-        "notifications": config.getboolean("behavior", "notifications", fallback=True),
+        **whisper,
+        "beam_size": whisper.getint("beam_size"),
+        "key": hotkey["key"],
+        "grab": hotkey.getboolean("grab"),
+        "auto_type": behavior.getboolean("auto_type"),
+        "paste_threshold": behavior.getint("paste_threshold"),
+        "paste_keys": behavior["paste_keys"],
+        "notifications": behavior.getboolean("notifications"),
     }
 
 
@@ -86,44 +121,99 @@ def find_keyboards():
     """Find all keyboard input devices."""
     keyboards = []
     for path in evdev.list_devices():
-        dev = evdev.InputDevice(path)
-        caps = dev.capabilities(verbose=False)
-        # Check if device has EV_KEY and has typical keyboard keys
-        if ecodes.EV_KEY in caps:
-            keys = caps[ecodes.EV_KEY]
-            if ecodes.KEY_A in keys and HOTKEY in keys:
-                keyboards.append(dev)
+        try:
+            dev = evdev.InputDevice(path)
+        except OSError:
+            continue  # device vanished or isn't readable
+        # Keep devices that have typical keyboard keys and the hotkey
+        keys = dev.capabilities().get(ecodes.EV_KEY, [])
+        if ecodes.KEY_A in keys and HOTKEY in keys:
+            keyboards.append(dev)
+        else:
+            dev.close()  # don't hold FDs for mice, power buttons, etc.
     return keyboards
 
 
 HOTKEY = get_hotkey(CONFIG["key"])
+GRAB_HOTKEY = CONFIG["grab"]
 MODEL_SIZE = CONFIG["model"]
 DEVICE = CONFIG["device"]
 COMPUTE_TYPE = CONFIG["compute_type"]
+BEAM_SIZE = CONFIG["beam_size"]
 AUTO_TYPE = CONFIG["auto_type"]
+PASTE_THRESHOLD = CONFIG["paste_threshold"]
 NOTIFICATIONS = CONFIG["notifications"]
 
+# Clipboard and typing commands for this session, resolved on PATH once at startup
+if SESSION_TYPE == "wayland":
+    CLIPBOARD_CMD = [shutil.which("wl-copy") or "wl-copy"]
+    TYPE_CMD = [shutil.which("wtype") or "wtype"]
+else:
+    CLIPBOARD_CMD = [shutil.which("xclip") or "xclip", "-selection", "clipboard"]
+    TYPE_CMD = [shutil.which("xdotool") or "xdotool", "type", "--clearmodifiers"]
+
+
+def get_paste_command(keys):
+    """Build the command that presses a paste shortcut such as ctrl+shift+v."""
+    if SESSION_TYPE == "wayland":
+        *modifiers, key = keys.lower().split("+")
+        cmd = TYPE_CMD[:]
+        for mod in modifiers:
+            cmd += ["-M", mod]
+        cmd += ["-k", key]
+        for mod in reversed(modifiers):
+            cmd += ["-m", mod]
+        return cmd
+    return [TYPE_CMD[0], "key", "--clearmodifiers", keys]
+
+
+PASTE_CMD = get_paste_command(CONFIG["paste_keys"])
+
 
 class Dictation:
     NOTIFICATION_MAX_AGE = 60  # seconds
+    MAX_RECORDING_SECONDS = 120  # longer recordings are truncated
+    SHUTDOWN_TIMEOUT = 5  # seconds to wait for an in-flight transcription on exit
 
-    def __init__(self):
+    def __init__(self, verbose=False):
+        self.verbose = verbose  # print per-utterance timings
         self.recording = False
         self.record_process = None
-        self.temp_file = None
+        self.record_thread = None
+        self.stream = None
+        # Preallocated 16kHz int16 capture buffer, reused for every recording
+        self._audio_buf = np.zeros(16000 * self.MAX_RECORDING_SECONDS, dtype=np.int16)
+        self._audio_wp = 0  # samples written so far
         self.model = None
         self.model_loaded = threading.Event()
         self.model_error = None
         self.running = True
         self._notification_ids = []  # list of (timestamp, id)
+        self._notify_lock = threading.Lock()  # notify() is called from the input and transcriber threads
+        self._notification = self._create_notification()
+        self.jobs = queue.Queue()  # recorded audio waiting to be transcribed
+        self._record_lock = threading.Lock()  # each keyboard is read on its own thread
 
         # Load model in background
         print(f"Loading Whisper model ({MODEL_SIZE})...")
         threading.Thread(target=self._load_model, daemon=True).start()
 
+        # Transcribe on a worker so the input loop can start a new recording right away
+        self.transcriber = threading.Thread(target=self._transcriber_loop, daemon=True)
+        self.transcriber.start()
+
     def _load_model(self):
         try:
-            self.model = WhisperModel(MODEL_SIZE, device=DEVICE, compute_type=COMPUTE_TYPE)
+            try:
+                self.model = self._create_model(MODEL_SIZE)
+            except LocalEntryNotFoundError as e:
+                # Only the default model falls back; a model the user chose should fail loudly
+                if MODEL_SIZE != DEFAULT_MODEL:
+                    raise
+                print(f"{MODEL_SIZE} is not downloaded and can't be fetched ({e}), falling back to {FALLBACK_MODEL}")
+                self.model = self._create_model(FALLBACK_MODEL)
+            get_vad_model()  # cached by faster-whisper; load it now rather than on first use
+            self._warmup_model()
             self.model_loaded.set()
             print(f"Model loaded. Ready for dictation!")
             print(f"Hold [{CONFIG['key'].upper()}] to record, release to transcribe.")
@@ -135,6 +225,35 @@ class Dictation:
             if "cudnn" in str(e).lower() or "cuda" in str(e).lower():
                 print("Hint: Try setting device = cpu in your config, or install cuDNN.")
 
+    def _create_model(self, model_size):
+        """Create the WhisperModel; compute_type = auto lets CTranslate2 pick the fastest supported type."""
+        model = WhisperModel(
+            model_size,
+            device=DEVICE,
+            compute_type=COMPUTE_TYPE,
+            cpu_threads=os.cpu_count() or 4,  # CTranslate2 defaults to 4
+            num_workers=1,  # one transcription at a time
+        )
+        # Report what CTranslate2 actually resolved "auto" to
+        print(f"Model: {model_size}, device: {model.model.device}, compute type: {model.model.compute_type}")
+        return model
+
+    def _warmup_model(self):
+        """Run one throwaway transcription so lazy backend init happens before the first hotkey press."""
+        silence = np.zeros(16000, dtype=np.float32)  # 1s at 16kHz
+        try:
+            segments, _ = self.model.transcribe(silence, beam_size=1, vad_filter=False)
+            list(segments)
+        except Exception as e:
+            print(f"Model warmup failed: {e}")
+
+    def _trim_silence(self, audio):
+        """Keep only the speech regions Silero VAD finds in the audio (empty if none)."""
+        speech = get_speech_timestamps(audio)
+        if not speech:
+            return audio[:0]
+        return np.concatenate([audio[chunk["start"]:chunk["end"]] for chunk in speech])
+
     def _close_notification(self, nid):
         """Close a notification by its ID via D-Bus."""
         subprocess.run(
@@ -159,50 +278,114 @@ class Dictation:
                 kept.append((ts, nid))
         self._notification_ids = kept
 
+    def _create_notification(self):
+        """Create a reusable libnotify notification, or None to fall back to notify-send."""
+        if not NOTIFICATIONS or Notify is None or not Notify.init("SoupaWhisper"):
+            return None
+        notification = Notify.Notification.new("", "", None)
+        notification.set_hint("x-canonical-private-synchronous", GLib.Variant("s", "soupawhisper"))
+        return notification
+
     def notify(self, title, message, icon="dialog-information", timeout=2000):
         """Send a desktop notification."""
         if not NOTIFICATIONS:
             return
-        self._trim_old_notifications()
-        result = subprocess.run(
+        with self._notify_lock:
+            if self._notification is not None:
+                # Update the one notification in place over libnotify's persistent D-Bus connection
+                try:
+                    self._notification.update(title, message, icon)
+                    self._notification.set_timeout(timeout)
+                    self._notification.show()
+                    return
+                except GLib.Error as e:
+                    print(f"libnotify failed, falling back to notify-send: {e}")
+                    self._notification = None
+
+            self._trim_old_notifications()
+            result = subprocess.run(
+                [
+                    "notify-send",
+                    "-a", "SoupaWhisper",
+                    "-i", icon,
+                    "-t", str(timeout),
+                    "-h", "string:x-canonical-private-synchronous:soupawhisper",
+                    "--print-id",
+                    title,
+                    message
+                ],
+                capture_output=True,
+                text=True,
+            )
+            nid = result.stdout.strip()
+            if nid:
+                self._notification_ids.append((time.monotonic(), int(nid)))
+
+    def _read_audio(self, stdout):
+        """Read raw PCM from arecord's stdout into the capture buffer until it closes or fills."""
+        view = memoryview(self._audio_buf).cast("B")
+        pos = 0
+        with stdout:
+            while pos < len(view):
+                n = stdout.readinto(view[pos:])
+                if not n:
+                    break
+                pos += n
+        self._audio_wp = pos // 2  # drop a trailing partial sample
+
+    def _audio_callback(self, indata, frames, time_info, status):
+        """Copy raw PCM delivered by the PortAudio stream into the capture buffer."""
+        wp = self._audio_wp
+        n = min(frames, len(self._audio_buf) - wp)
+        self._audio_buf[wp:wp + n] = np.frombuffer(indata, dtype=np.int16, count=n)
+        self._audio_wp = wp + n
+
+    def _start_arecord(self):
+        # Record using arecord (ALSA) - works on most Linux systems.
+        # Raw PCM is streamed over stdout so nothing touches the disk.
+        self.record_process = subprocess.Popen(
             [
-                "notify-send",
-                "-a", "SoupaWhisper",
-                "-i", icon,
-                "-t", str(timeout),
-                "-h", "string:x-canonical-private-synchronous:soupawhisper",
-                "--print-id",
-                title,
-                message
+                "arecord",
+                "-f", "S16_LE",  # Format: 16-bit little-endian
+                "-r", "16000",   # Sample rate: 16kHz (what Whisper expects)
+                "-c", "1",       # Mono
+                "-t", "raw",
             ],
-            capture_output=True,
-            text=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL
         )
-        nid = result.stdout.strip()
-        if nid:
-            self._notification_ids.append((time.monotonic(), int(nid)))
+        self.record_thread = threading.Thread(
+            target=self._read_audio, args=(self.record_process.stdout,), daemon=True
+        )
+        self.record_thread.start()
 
     def start_recording(self):
         if self.recording or self.model_error:
             return
 
         self.recording = True
-        self.temp_file = tempfile.NamedTemporaryFile(suffix=".wav", delete=False)
-        self.temp_file.close()
+        self._audio_wp = 0
+
+        if sd is not None:
+            # Capture in-process via PortAudio, avoiding a fork/exec per recording
+            try:
+                self.stream = sd.RawInputStream(
+                    samplerate=16000,  # what Whisper expects
+                    channels=1,
+                    dtype="int16",
+                    blocksize=1024,
+                    callback=self._audio_callback,
+                )
+                self.stream.start()
+            except Exception as e:
+                self.stream = None
+                self.recording = False
+                print(f"Failed to open audio input: {e}")
+                self.notify("Error", "Failed to open audio input", "dialog-error", 3000)
+                return
+        else:
+            self._start_arecord()
 
-        # Record using arecord (ALSA) - works on most Linux systems
-        self.record_process = subprocess.Popen(
-            [
-                "arecord",
-                "-f", "S16_LE",  # Format: 16-bit little-endian
-                "-r", "16000",   # Sample rate: 16kHz (what Whisper expects)
-                "-c", "1",       # Mono
-                "-t", "wav",
-                self.temp_file.name
-            ],
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL
-        )
         print("Recording...")
         self.notify("Recording...", f"Release {CONFIG['key'].upper()} when done", "audio-input-microphone", 30000)
 
@@ -212,10 +395,51 @@ class Dictation:
 
         self.recording = False
 
+        if self.stream:
+            self.stream.stop()
+            self.stream.close()
+            self.stream = None
         if self.record_process:
             self.record_process.terminate()
             self.record_process.wait()
             self.record_process = None
+        if self.record_thread:
+            self.record_thread.join()
+            self.record_thread = None
+
+        if self._audio_wp == len(self._audio_buf):
+            print(f"Recording reached the {self.MAX_RECORDING_SECONDS}s limit and was truncated")
+
+        # int16 PCM -> float32 in [-1, 1], the format faster-whisper expects.
+        # astype() copies, so the capture buffer is free for the next recording.
+        audio = self._audio_buf[:self._audio_wp].astype(np.float32) / 32768.0
+
+        self.jobs.put(audio)
+
+    def _transcriber_loop(self):
+        """Transcribe queued recordings one at a time, off the input thread."""
+        while self.running:
+            audio = self.jobs.get()
+            if audio is None:  # sentinel from stop()
+                break
+            try:
+                self._transcribe(audio)
+            except Exception as e:
+                # Keep the worker alive, otherwise every later recording is silently dropped
+                print(f"Error: {e}")
+
+    def _transcribe(self, audio):
+        # Trim silence up front so Whisper only sees speech, and skip it entirely if there is none
+        t_vad = time.perf_counter()
+        try:
+            audio = self._trim_silence(audio)
+        except Exception as e:
+            print(f"VAD failed, transcribing untrimmed audio: {e}")
+        t_vad_done = time.perf_counter()
+        if audio.size == 0:
+            print("No speech detected")
+            self.notify("No speech detected", "Try speaking louder", "dialog-warning", 2000)
+            return
 
         print("Transcribing...")
         self.notify("Transcribing...", "Processing your speech", "emblem-synchronizing", 30000)
@@ -230,34 +454,36 @@ class Dictation:
 
         # Transcribe
         try:
+            multilingual = self.model.model.is_multilingual  # only used to label the timings
+            t_start = time.perf_counter()
             segments, info = self.model.transcribe(
-                self.temp_file.name,
-                beam_size=5,
-                vad_filter=True,
+                audio,
+                beam_size=BEAM_SIZE,
+                temperature=0.0,
+                condition_on_previous_text=False,
+                without_timestamps=True,  # segment times are discarded, don't decode them
+                vad_filter=False,  # already trimmed above
             )
 
+            # transcribe() extracts features, and on multilingual models also runs an
+            # encoder pass to detect the language. The per-window encoder and decoder
+            # passes both run lazily while the segments are iterated.
+            t_setup = time.perf_counter()
             text = " ".join(segment.text.strip() for segment in segments)
+            t_done = time.perf_counter()
 
             if text:
                 # Copy to clipboard
-                if SESSION_TYPE == "wayland":
-                    process = subprocess.Popen(
-                        ["wl-copy"],
-                        stdin=subprocess.PIPE
-                    )
-                else:
-                    process = subprocess.Popen(
-                        ["xclip", "-selection", "clipboard"],
-                        stdin=subprocess.PIPE
-                    )
+                process = subprocess.Popen(CLIPBOARD_CMD, stdin=subprocess.PIPE)
                 process.communicate(input=text.encode())
 
                 # Type it into the active input field
                 if AUTO_TYPE:
-                    if SESSION_TYPE == "wayland":
-                        subprocess.run(["wtype", text])
+                    if PASTE_THRESHOLD and len(text) > PASTE_THRESHOLD:
+                        # One paste shortcut instead of a synthetic keypress per character
+                        subprocess.run(PASTE_CMD)
                     else:
-                        subprocess.run(["xdotool", "type", "--clearmodifiers", text])
+                        subprocess.run(TYPE_CMD + [text])
 
                 print(f"Copied: {text}")
                 self.notify("Copied!", text[:100] + ("..." if len(text) > 100 else ""), "emblem-ok-symbolic", 3000)
@@ -265,18 +491,59 @@ class Dictation:
                 print("No speech detected")
                 self.notify("No speech detected", "Try speaking louder", "dialog-warning", 2000)
 
+            if self.verbose:
+                # Measured after the text is delivered so the extra encoder pass adds no latency
+                encode = self._time_encoder(audio)
+                print(
+                    f"Timing: vad {(t_vad_done - t_vad) * 1000:.0f}ms, "
+                    f"{'setup+langid' if multilingual else 'setup'} {(t_setup - t_start) * 1000:.0f}ms, "
+                    f"encode ~{encode * 1000:.0f}ms, "
+                    f"decode ~{max(t_done - t_setup - encode, 0) * 1000:.0f}ms, "
+                    f"total {(t_done - t_vad) * 1000:.0f}ms "
+                    f"({audio.size / 16000:.1f}s of speech)"
+                )
+
         except Exception as e:
             print(f"Error: {e}")
             self.notify("Error", str(e)[:50], "dialog-error", 3000)
-        finally:
-            # Cleanup temp file
-            if self.temp_file and os.path.exists(self.temp_file.name):
-                os.unlink(self.temp_file.name)
+
+    def _time_encoder(self, audio):
+        """Estimate the encoder share of a transcription by timing one extra encoder pass.
+
+        faster-whisper encodes each 30s window separately, so one window is timed
+        and scaled by the number of windows in the audio.
+        """
+        features = self.model.feature_extractor(audio)
+        window = pad_or_trim(features[:, :self.model.feature_extractor.nb_max_frames])
+        t0 = time.perf_counter()
+        self.model.encode(window)
+        windows = max(1, math.ceil(audio.size / self.model.feature_extractor.n_samples))
+        return (time.perf_counter() - t0) * windows
 
     def stop(self):
         print("\nExiting...")
         self.running = False
-        os._exit(0)
+
+        # Let an in-flight transcription finish so the model isn't freed under it
+        self.jobs.put(None)
+        self.transcriber.join(timeout=self.SHUTDOWN_TIMEOUT)
+
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+        if self.record_process:
+            self.record_process.terminate()
+            self.record_process = None
+
+        # A worker still inside CTranslate2 native code can't be torn down safely
+        if self.transcriber.is_alive() or not self.model_loaded.is_set():
+            print("Model still busy, forcing exit.")
+            os._exit(0)
+
+        # Release the model (and its CUDA context) before the interpreter tears down
+        self.model = None
+        gc.collect()
+        sys.exit(0)
 
     def run(self):
         keyboards = find_keyboards()
@@ -286,44 +553,110 @@ class Dictation:
 
         print(f"Listening on: {', '.join(dev.name for dev in keyboards)}")
 
-        # Use selectors to monitor multiple keyboards
-        sel = selectors.DefaultSelector()
+        # Read each keyboard on its own thread, blocking until events arrive
+        threads = []
         for dev in keyboards:
-            sel.register(dev, selectors.EVENT_READ)
+            passthrough = self._grab_device(dev) if GRAB_HOTKEY else None
+            thread = threading.Thread(target=self._device_loop, args=(dev, passthrough), daemon=True)
+            thread.start()
+            threads.append(thread)
 
-        while self.running:
-            for key, mask in sel.select(timeout=1):
-                dev = key.fileobj
-                try:
-                    for event in dev.read():
-                        if event.type == ecodes.EV_KEY and event.code == HOTKEY:
-                            if event.value == 1:  # key down
-                                self.start_recording()
-                            elif event.value == 0:  # key up
-                                self.stop_recording()
-                except OSError:
-                    pass  # device disconnected
+        for thread in threads:
+            thread.join()
+
+        print("All keyboard devices disconnected.")
+        sys.exit(1)
+
+    def _grab_device(self, dev):
+        """Grab a keyboard and return a virtual copy of it that receives every non-hotkey event.
+
+        This keeps the hotkey from reaching the focused application. Returns None,
+        leaving the keyboard ungrabbed, if the virtual device can't be created.
+        """
+        try:
+            passthrough = evdev.UInput.from_device(dev, name=f"{dev.name} (SoupaWhisper)")
+        except (OSError, evdev.UInputError) as e:
+            print(f"Cannot grab {dev.name}, hotkey will reach other apps: {e}")
+            print("Hint: grab needs write access to /dev/uinput.")
+            return None
+        try:
+            # Grabbing while a key is down would send its key-up to the virtual copy,
+            # leaving the key stuck (and auto-repeating) in the compositor
+            if dev.active_keys():
+                print(f"Waiting for keys on {dev.name} to be released before grabbing...")
+                while dev.active_keys():
+                    time.sleep(0.05)
+            dev.grab()
+        except OSError as e:
+            passthrough.close()
+            print(f"Cannot grab {dev.name}, hotkey will reach other apps: {e}")
+            return None
+        return passthrough
+
+    def _handle_hotkey(self, handler):
+        """Run a hotkey handler, logging errors so they can't stop the keyboard's reader."""
+        try:
+            with self._record_lock:
+                handler()
+        except Exception as e:
+            print(f"Error: {e}")
+
+    def _device_loop(self, dev, passthrough=None):
+        """Handle hotkey events from a single keyboard until it disconnects.
+
+        If the keyboard is grabbed, all other events are forwarded to passthrough.
+        """
+        hotkey = HOTKEY
+        ev_key = ecodes.EV_KEY
+        try:
+            for event in dev.read_loop():
+                if event.code == hotkey and event.type == ev_key:
+                    if event.value == 1:  # key down
+                        self._handle_hotkey(self.start_recording)
+                    elif event.value == 0:  # key up
+                        self._handle_hotkey(self.stop_recording)
+                elif passthrough is not None:
+                    try:
+                        passthrough.write_event(event)
+                    except OSError as e:
+                        # Can't forward keys any more: release the keyboard rather than swallow them
+                        print(f"Passthrough for {dev.name} failed, releasing grab: {e}")
+                        self._release_grab(dev, passthrough)
+                        passthrough = None
+        except OSError:
+            print(f"Device disconnected: {dev.name}")
+        finally:
+            if passthrough is not None:
+                self._release_grab(dev, passthrough)
+            dev.close()
+
+    def _release_grab(self, dev, passthrough):
+        """Ungrab a keyboard and close its virtual copy."""
+        try:
+            dev.ungrab()
+        except OSError:
+            pass  # already released, or the device is gone
+        passthrough.close()
 
 
 def check_dependencies():
     """Check that required system commands are available."""
-    missing = []
+    required = []
 
-    if subprocess.run(["which", "arecord"], capture_output=True).returncode != 0:
-        missing.append(("arecord", "alsa-utils"))
+    # arecord is only needed when sounddevice is unavailable
+    if sd is None:
+        required.append(("arecord", "alsa-utils"))
 
     if SESSION_TYPE == "wayland":
-        if subprocess.run(["which", "wl-copy"], capture_output=True).returncode != 0:
-            missing.append(("wl-copy", "wl-clipboard"))
+        required.append(("wl-copy", "wl-clipboard"))
         if AUTO_TYPE:
-            if subprocess.run(["which", "wtype"], capture_output=True).returncode != 0:
-                missing.append(("wtype", "wtype"))
+            required.append(("wtype", "wtype"))
     else:
-        if subprocess.run(["which", "xclip"], capture_output=True).returncode != 0:
-            missing.append(("xclip", "xclip"))
+        required.append(("xclip", "xclip"))
         if AUTO_TYPE:
-            if subprocess.run(["which", "xdotool"], capture_output=True).returncode != 0:
-                missing.append(("xdotool", "xdotool"))
+            required.append(("xdotool", "xdotool"))
+
+    missing = [(cmd, pkg) for cmd, pkg in required if shutil.which(cmd) is None]
 
     if missing:
         print(f"Missing dependencies (session: {SESSION_TYPE}):")
@@ -341,7 +674,12 @@ def main():
         action="version",
         version=f"SoupaWhisper {__version__}"
     )
-    parser.parse_args()
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="print timing for each transcription"
+    )
+    args = parser.parse_args()
 
     print(f"SoupaWhisper v{__version__}")
     print(f"Session: {SESSION_TYPE}")
@@ -349,13 +687,14 @@ def main():
 
     check_dependencies()
 
-    dictation = Dictation()
+    dictation = Dictation(verbose=args.verbose)
 
-    # Handle Ctrl+C gracefully
-    def handle_sigint(sig, frame):
+    # Handle Ctrl+C and systemd stop gracefully
+    def handle_signal(sig, frame):
         dictation.stop()
 
-    signal.signal(signal.SIGINT, handle_sigint)
+    signal.signal(signal.SIGINT, handle_signal)
+    signal.signal(signal.SIGTERM, handle_signal)
 
     dictation.run()
 